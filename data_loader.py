@@ -8,6 +8,41 @@ from torchvision import transforms as T
 from utils.bboxes import letterbox
 
 
+class Frame():
+    # decoded frame (RGB) shared by the ROI stage, the window cropper and the visualiser
+    def __init__(self, path, image, coco):
+        self.path = os.path.abspath(path)
+        self.image = image
+        self.coco = coco
+        self.height, self.width = image.shape[:2]
+
+
+    def bgr(self):
+        # a fresh BGR copy, safe to draw on
+        return np.ascontiguousarray(self.image[:, :, ::-1])
+
+
+    def __reduce__(self):
+        # pixels travel as a tensor, so DataLoader workers hand them over through shared memory
+        return (_rebuild_frame, (self.path, torch.from_numpy(self.image), self.coco))
+
+
+def _rebuild_frame(path, image, coco):
+    return Frame(path, image.numpy(), coco)
+
+
+def load_frame(path, dataset):
+    image = cv2.imread(path)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return Frame(path, image, dataset.get_image_metadata(path))
+
+
+def collate_frame(batch):
+    # batch_size=1 loader: keep the Frame object as is, add the batch dim to the network input
+    img, frame = batch[0]
+    return (img.unsqueeze(0) if img is not None else None), frame
+
+
 class SingleDetectionDataset(torch.utils.data.Dataset):
     
     def __init__(self, paths, dataset, det_inf_size, det_transform):
@@ -37,43 +72,39 @@ class SingleDetectionDataset(torch.utils.data.Dataset):
         
         
 
-class ROIDataset(torch.utils.data.Dataset):
-    def __init__(self, paths, dataset, roi_inf_size, roi_transform):
+class FrameDataset(torch.utils.data.Dataset):
+    # decodes every frame once, the transform (if any) produces the network input from the same pixels
+    def __init__(self, paths, dataset, inf_size=None, transform=None):
         self.paths = [x for x in paths if os.path.isfile(x)]
-        self.roi_transform = roi_transform(roi_inf_size[0], roi_inf_size[1])
+        self.transform = transform(inf_size[0], inf_size[1]) if transform is not None else None
         self.dataset = dataset
 
 
-
     def __len__(self):
         return len(self.paths)
 
-    def __getitem__(self,idx):
-        image = cv2.imread(self.paths[idx])
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        H,W = image.shape[:2]
-        
-        image = self.roi_transform(image)
 
-        metadata = {
-            'image_path': os.path.abspath(self.paths[idx]),
-            'coco': self.dataset.get_image_metadata(self.paths[idx])
-        }            
-    
-        return image, metadata
+    def __getitem__(self, idx):
+        frame = load_frame(self.paths[idx], self.dataset)
+        image = self.transform(frame.image) if self.transform is not None else None
+        return image, frame
+
+
+
+class ROIDataset(FrameDataset):
+    def __init__(self, paths, dataset, roi_inf_size, roi_transform):
+        super().__init__(paths, dataset, roi_inf_size, roi_transform)
     
 
     
 class WindowDetectionDataset(torch.utils.data.Dataset):
-    def __init__(self, path, dataset, bboxes, size):
-        self.path = os.path.abspath(path)
-        self.image = cv2.imread(path)[:,:,::-1]
-        self.image = np.ascontiguousarray(self.image)
+    def __init__(self, frame, bboxes, size):
+        self.path = frame.path
+        self.image = frame.image
         self.bboxes = torch.tensor(bboxes)
         self.size = size
         self.transform = T.ToTensor()
         self.h, self.w = self.image.shape[:2]
-        self.dataset = dataset
 
 
     def __len__(self):
@@ -119,7 +150,6 @@ class WindowDetectionDataset(torch.utils.data.Dataset):
             'det_shape': torch.tensor([det_h, det_w]), 
             'crop_shape': torch.tensor([crop_h, crop_w]), 
             'unpadded_shape': torch.tensor([unpadded[0], unpadded[1]]).long() ,
-            'coco': self.dataset.get_image_metadata(self.path),
             'roi_shape': torch.tensor([roi_h, roi_w]),
         }
 
@@ -14,7 +14,7 @@ import torch
 from torch.utils.data import DataLoader
 
 from configs import CONFIG
-from data_loader import SingleDetectionDataset, ROIDataset, WindowDetectionDataset
+from data_loader import FrameDataset, ROIDataset, WindowDetectionDataset, collate_frame
 from utils.bboxes import getDetectionBboxesSorted, NMS, non_max_suppression, scale_coords, xyxy2xywh, findBboxes, rot90points, getSlidingWindowBBoxes
 from utils.general import save_args, load_model
 from utils.drawing import make_vis
@@ -82,18 +82,17 @@ if __name__ == '__main__':
         seq_flist = sorted(seq_flist)
         if 'roi' in args.mode:
             dataset = ROIDataset(seq_flist, ds, cfg_roi["in_size"], cfg_roi["transform"])
-            dataloader = DataLoader(dataset, batch_size=1, shuffle=False, num_workers=4)
         else:
-            dataset = SingleDetectionDataset(seq_flist, ds, cfg_det["in_size"], cfg_det["transform"])
-            dataloader = DataLoader(dataset, batch_size=1, shuffle=False, num_workers=4)
+            dataset = FrameDataset(seq_flist, ds) # track only, no network input needed
+        dataloader = DataLoader(dataset, batch_size=1, shuffle=False, num_workers=4, collate_fn=collate_frame)
 
         tracker = (trk_class)(**cfg_trk['args'])
         
         seg_mask, mot_mask = None, None
         with torch.no_grad():
-            for i, (img, metadata) in tqdm(enumerate(dataloader)):
+            for i, (img, frame) in tqdm(enumerate(dataloader)):
 
-                H_orig, W_orig = metadata['coco']['height'].item(), metadata['coco']['width'].item()
+                H_orig, W_orig = frame.coco['height'], frame.coco['width']
                 original_shape = (H_orig, W_orig)
 
 
@@ -106,8 +105,8 @@ if __name__ == '__main__':
                     # sliding-window initialization method
                     det_bboxes = getSlidingWindowBBoxes([0,0,W_orig,H_orig], cfg_det['in_size'])[0]
                     det_bboxes = np.array(det_bboxes).astype(np.int32)
-                    det_dataset =  WindowDetectionDataset(metadata['image_path'][0], ds, det_bboxes, cfg_det['in_size'])
-                    det_dataloader = DataLoader(det_dataset, batch_size=len(det_dataset) if len(det_dataset)>0 else 1, shuffle=False, num_workers=4) # all windows in a single batch
+                    det_dataset =  WindowDetectionDataset(frame, det_bboxes, cfg_det['in_size'])
+                    det_dataloader = DataLoader(det_dataset, batch_size=len(det_dataset) if len(det_dataset)>0 else 1, shuffle=False, num_workers=0) # all windows in a single batch, cropped in-process
 
                     img_out = torch.empty((0, 6))
                     win_out = torch.empty((0, 4))
@@ -178,10 +177,10 @@ if __name__ == '__main__':
                     trks = tracker.get_pred_locations()
                     tracker.update(img_out.detach().cpu().numpy()[:, :-1], trks)
                     if args.debug:
-                        frame = cv2.imread(metadata['image_path'][0])
+                        vis_frame = frame.bgr()
                         
-                        frame, frame_dets = make_vis(
-                            frame, 
+                        vis_frame, vis_dets = make_vis(
+                            vis_frame, 
                             seg_mask_fullres, 
                             mot_mask, 
                             det_bboxes, 
@@ -191,17 +190,17 @@ if __name__ == '__main__':
                             args.vis_conf_th, 
                             show_label=args.show_label
                         )
-                        out_fname_wins = f"{windows_dir}/{seq_name}/{os.path.basename(metadata['image_path'][0])}"
-                        out_fname_dets = f"{detections_dir}/{seq_name}/{os.path.basename(metadata['image_path'][0])}"
+                        out_fname_wins = f"{windows_dir}/{seq_name}/{os.path.basename(frame.path)}"
+                        out_fname_dets = f"{detections_dir}/{seq_name}/{os.path.basename(frame.path)}"
                         os.makedirs(os.path.dirname(out_fname_wins), exist_ok=True); os.makedirs(os.path.dirname(out_fname_dets), exist_ok=True)
-                        cv2.imwrite(out_fname_wins, frame); cv2.imwrite(out_fname_dets, frame_dets)
+                        cv2.imwrite(out_fname_wins, vis_frame); cv2.imwrite(out_fname_dets, vis_dets)
 
                     img_out[:,:4] = xyxy2xywh(img_out[:,:4])
                     for p in img_out.tolist():
                         annotations.append(
                             {
                                 "id": len(annotations), 
-                                "image_id": int(metadata['coco']['id'].item()),
+                                "image_id": int(frame.coco['id']),
                                 "category_id": int(p[-1]),
                                 "bbox": [round(x, 3) for x in p[:4]],
                                 "area": p[2] * p[3],
@@ -264,8 +263,8 @@ if __name__ == '__main__':
                     indices = indices[0]
                     det_bboxes = det_bboxes[indices, :]
 
-                det_dataset =  WindowDetectionDataset(metadata['image_path'][0], ds, det_bboxes, cfg_det['in_size'])
-                det_dataloader = DataLoader(det_dataset, batch_size=len(det_dataset) if len(det_dataset)>0 else 1, shuffle=False, num_workers=4) # all windows in a single batch
+                det_dataset =  WindowDetectionDataset(frame, det_bboxes, cfg_det['in_size'])
+                det_dataloader = DataLoader(det_dataset, batch_size=len(det_dataset) if len(det_dataset)>0 else 1, shuffle=False, num_workers=0) # all windows in a single batch, cropped in-process
 
                 img_out = torch.empty((0, 6))
                 win_out = torch.empty((0, 4))
@@ -330,9 +329,9 @@ if __name__ == '__main__':
 
                 
                 if args.debug:
-                    frame = cv2.imread(metadata['image_path'][0])
-                    frame, frame_dets = make_vis(
-                        frame, 
+                    vis_frame = frame.bgr()
+                    vis_frame, vis_dets = make_vis(
+                        vis_frame, 
                         seg_mask_fullres, 
                         mot_mask, 
                         det_bboxes, 
@@ -342,17 +341,17 @@ if __name__ == '__main__':
                         args.vis_conf_th, 
                         show_label=args.show_label
                     )
-                    out_fname_wins = f"{windows_dir}/{seq_name}/{os.path.basename(metadata['image_path'][0])}"
-                    out_fname_dets = f"{detections_dir}/{seq_name}/{os.path.basename(metadata['image_path'][0])}"
+                    out_fname_wins = f"{windows_dir}/{seq_name}/{os.path.basename(frame.path)}"
+                    out_fname_dets = f"{detections_dir}/{seq_name}/{os.path.basename(frame.path)}"
                     os.makedirs(os.path.dirname(out_fname_wins), exist_ok=True); os.makedirs(os.path.dirname(out_fname_dets), exist_ok=True)
-                    cv2.imwrite(out_fname_wins, frame); cv2.imwrite(out_fname_dets, frame_dets)
+                    cv2.imwrite(out_fname_wins, vis_frame); cv2.imwrite(out_fname_dets, vis_dets)
                 
                 img_out[:,:4] = xyxy2xywh(img_out[:,:4])
                 for p in img_out.tolist():
                     annotations.append(
                         {
                             "id": len(annotations), 
-                            "image_id": int(metadata['coco']['id'].item()),
+                            "image_id": int(frame.coco['id']),
                             "category_id": int(p[-1]),
                             "bbox": [round(x, 3) for x in p[:4]],
                             "area": p[2] * p[3],